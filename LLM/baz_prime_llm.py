@@ -55,8 +55,46 @@ Example usage:
 
 from __future__ import annotations
 
+import sys
+from collections import Counter, deque
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Tuple, Set
+from itertools import compress
+from math import isqrt
+from types import MappingProxyType
+from typing import Dict, Generator, List, Optional, Tuple, Set, Union
+
+# A prime encoding is a tuple of (prime, exponent) pairs sorted by prime.  The
+# canonical ordering makes encodings hashable and directly comparable, and lets
+# multiplication and division run as a single linear merge.
+Encoding = Tuple[Tuple[int, int], ...]
+
+# Integers with |n| up to this bound keep their factorisation cached on the
+# encoder, since add/subtract re-encode the same small values repeatedly.
+INT_CACHE_MAX = 10_000
+
+# Largest number the shared prime sieve is grown to while factorising.
+# Factors beyond it are found by trial division, so one huge integer does
+# not leave millions of primes behind on the generator.
+SIEVE_MAX = 1 << 20
+
+# Witnesses for the Miller-Rabin test.  The first 13 already make it exact
+# for every n below MR_EXACT_BOUND (Sorenson & Webster, 2015); above it a
+# composite passes all 25 with probability below 4^-25.
+MR_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47,
+                53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+MR_EXACT_BOUND = 3_317_044_064_679_887_385_961_981
+
+# Largest divisor tried past the sieve.  An integer whose remaining cofactor
+# is composite with no factor up to this bound is rejected rather than
+# factorised by an open-ended search.
+TRIAL_DIVISION_MAX = 10_000_000
+
+# Name of the variable that rule conditions and conclusions range over, as in
+# "if X is human then X is mortal".
+VARIABLE = '_x_'
+
+# Default bound on the number of reasoning steps below a query
+MAX_DEPTH = 32
 
 ###############################################################################
 # Prime generation
@@ -73,16 +111,16 @@ class PrimeGenerator:
         # Extend the sieve to at least n
         if n <= self._sieve_limit:
             return
-        sieve = [True] * (n + 1)
-        sieve[0] = sieve[1] = False
-        for p in range(2, int(n ** 0.5) + 1):
+        # One byte per number (1 = prime).  Multiples are struck out with a
+        # slice assignment, so the marking runs in C rather than per element.
+        sieve = bytearray([1]) * (n + 1)
+        sieve[0] = sieve[1] = 0
+        for p in range(2, isqrt(n) + 1):
             if sieve[p]:
-                for multiple in range(p * p, n + 1, p):
-                    sieve[multiple] = False
+                sieve[p * p::p] = bytes(len(range(p * p, n + 1, p)))
         # Merge newly found primes into list
-        for i in range(max(2, self._sieve_limit + 1), n + 1):
-            if sieve[i]:
-                self._primes.append(i)
+        start = max(2, self._sieve_limit + 1)
+        self._primes.extend(compress(range(start, n + 1), sieve[start:]))
         self._sieve_limit = n
 
     def get(self, index: int) -> int:
@@ -94,6 +132,34 @@ class PrimeGenerator:
             self._generate_up_to(self._sieve_limit * 2 or 1000)
         return self._primes[index]
 
+
+def _is_prime(n: int) -> bool:
+    """Miller-Rabin primality test over MR_WITNESSES.
+
+    Exact below MR_EXACT_BOUND; above it, probabilistic with a false
+    positive rate below 4^-25.
+    """
+    if n < 2:
+        return False
+    for p in MR_WITNESSES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in MR_WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
 ###############################################################################
 # Encoder for integers and concepts
 ###############################################################################
@@ -116,8 +182,18 @@ class PrimeEncoder:
         self._concept_to_prime: Dict[str, int] = {}
         self._prime_to_concept: Dict[int, str] = {}
         self._next_index: int = 0
-        # Reserve a special prime for negative sign encoding
-        self.sign_prime = self._assign_prime('_sign')
+        self._int_cache: Dict[int, Encoding] = {}
+        # Reserve a special factor for negative sign encoding.  The unit -1 is
+        # used rather than a concept prime so the sign can never be confused
+        # with a genuine prime factor (e.g. 2 in any even number).
+        self.sign_prime = -1
+        self._concept_to_prime['_sign'] = self.sign_prime
+        self._prime_to_concept[self.sign_prime] = '_sign'
+        # The rule variable likewise gets a reserved non-prime factor, so
+        # the reasoner can recognise it without comparing names.
+        self.var_prime = 0
+        self._concept_to_prime[VARIABLE] = self.var_prime
+        self._prime_to_concept[self.var_prime] = VARIABLE
 
     def _assign_prime(self, concept: str) -> int:
         p = self.prime_gen.get(self._next_index)
@@ -133,85 +209,169 @@ class PrimeEncoder:
             return self._concept_to_prime[key]
         return self._assign_prime(key)
 
+    def lookup_prime(self, concept: str) -> Optional[int]:
+        """Return the prime representing the given concept, or None if it has none yet.
+
+        Unlike `get_prime` this never assigns a prime, so it is safe to use
+        while reasoning over a fixed knowledge base.
+        """
+        return self._concept_to_prime.get(concept.lower())
+
     # Integer encoding/decoding -------------------------------------------------
 
-    def encode_integer(self, n: int) -> Dict[int, int]:
-        """Encode an integer as a map from prime to exponent.
+    def encode_integer(self, n: int) -> Encoding:
+        """Encode an integer as sorted (prime, exponent) pairs.
 
         Negative numbers are represented by including the sign prime if the
         integer is negative【248†L79-L83】.  Zero has no prime encoding in this
-        framework, so an error is raised.
+        framework, so an error is raised.  Encodings of small integers are
+        cached; they are immutable tuples, so the cached value is returned
+        as is.
+
+        Factors are found by trial division, and a cofactor that passes
+        `_is_prime` is taken as a single prime factor.  An integer left with
+        a composite cofactor that has no factor up to TRIAL_DIVISION_MAX
+        raises ValueError.
         """
+        if -INT_CACHE_MAX <= n <= INT_CACHE_MAX:
+            enc = self._int_cache.get(n)
+            if enc is None:
+                enc = self._int_cache[n] = self._factorise(n)
+            return enc
+        return self._factorise(n)
+
+    def _factorise(self, n: int) -> Encoding:
         if n == 0:
             raise ValueError("Zero cannot be encoded uniquely as a prime product.")
-        encoding: Dict[int, int] = {}
+        # Factors are produced in increasing order (sign first), so the
+        # result is already in canonical sorted form
+        factors: List[Tuple[int, int]] = []
         if n < 0:
-            encoding[self.sign_prime] = 1
+            factors.append((self.sign_prime, 1))
             n = -n
-        # Factorise the absolute value
+        # Factorise the absolute value by trial division
         remaining = n
-        # Ensure prime generator has enough primes
-        # We'll expand until sqrt(remaining) < last prime
-        while True:
-            for i in range(self._next_index):
-                p = self.prime_gen.get(i)
-                if p * p > remaining:
-                    break
+        limit = isqrt(remaining)
+        # Ensure prime generator has every prime up to sqrt(remaining), as
+        # far as SIEVE_MAX
+        gen = self.prime_gen
+        target = min(limit, SIEVE_MAX)
+        while gen._sieve_limit < target:
+            gen._generate_up_to(min(gen._sieve_limit * 2, SIEVE_MAX))
+        for p in gen._primes:
+            if p > limit:
+                break
+            if remaining % p == 0:
+                exp = 0
                 while remaining % p == 0:
-                    encoding[p] = encoding.get(p, 0) + 1
                     remaining //= p
-            break
+                    exp += 1
+                factors.append((p, exp))
+                limit = isqrt(remaining)
+        if limit > gen._sieve_limit and not _is_prime(remaining):
+            # Beyond the sieve, trial-divide by the 6k±1 candidates locally
+            # instead of extending the shared sieve to sqrt(remaining)
+            d = gen._sieve_limit // 6 * 6 - 1
+            while d <= limit:
+                if d > TRIAL_DIVISION_MAX:
+                    raise ValueError(
+                        f"Cannot encode {n}: cofactor {remaining} is composite with "
+                        f"no prime factor up to {TRIAL_DIVISION_MAX}.")
+                for q in (d, d + 2):
+                    if remaining % q == 0:
+                        exp = 0
+                        while remaining % q == 0:
+                            remaining //= q
+                            exp += 1
+                        factors.append((q, exp))
+                        limit = 0 if _is_prime(remaining) else isqrt(remaining)
+                d += 6
         if remaining > 1:
-            # remaining itself is a prime; ensure prime mapping exists
-            # If the remaining prime is not a concept prime, it still needs to
-            # be represented in the encoding.  We allow direct integer primes.
-            encoding[remaining] = encoding.get(remaining, 0) + 1
-        return encoding
-
-    def decode_integer(self, encoding: Dict[int, int]) -> int:
-        """Decode a prime‐exponent map back to an integer."""
+            # remaining itself is a prime.  If it is not a concept prime, it
+            # still needs to be represented in the encoding.  We allow direct
+            # integer primes.
+            factors.append((remaining, 1))
+        return tuple(factors)
+
+    def decode_integer(self, encoding: Encoding) -> int:
+        """Decode a prime‐exponent encoding back to an integer."""
         sign = 1
         result = 1
-        for p, exp in encoding.items():
+        for p, exp in encoding:
             if p == self.sign_prime:
                 sign *= -1 if exp % 2 == 1 else 1
                 continue
             result *= p ** exp
         return sign * result
 
-    def multiply(self, a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    def multiply(self, a: Encoding, b: Encoding) -> Encoding:
         """E(a) ⊗ E(b) = E(a)·E(b), combine exponents【248†L50-L56】."""
-        result: Dict[int, int] = {}
-        for p, e in a.items():
-            result[p] = result.get(p, 0) + e
-        for p, e in b.items():
-            result[p] = result.get(p, 0) + e
-        # Remove zero exponents if any
-        return {p: e for p, e in result.items() if e != 0}
-
-    def divide(self, a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+        # When every prime of one side precedes every prime of the other (an
+        # empty side included) no exponents combine and the product is the
+        # concatenation, built at C speed.
+        if not a or not b or a[-1][0] < b[0][0]:
+            return a + b
+        if b[-1][0] < a[0][0]:
+            return b + a
+        # Both encodings are sorted by prime, so merge them in one pass
+        result: List[Tuple[int, int]] = []
+        i = j = 0
+        len_a, len_b = len(a), len(b)
+        while i < len_a and j < len_b:
+            pa, ea = a[i]
+            pb, eb = b[j]
+            if pa < pb:
+                result.append(a[i])
+                i += 1
+            elif pb < pa:
+                result.append(b[j])
+                j += 1
+            else:
+                # Remove zero exponents if any
+                if ea + eb != 0:
+                    result.append((pa, ea + eb))
+                i += 1
+                j += 1
+        result.extend(a[i:])
+        result.extend(b[j:])
+        return tuple(result)
+
+    def divide(self, a: Encoding, b: Encoding) -> Encoding:
         """E(a) � E(b) = E(a) / E(b) if divisible【248†L59-L64】."""
-        result = a.copy()
-        for p, e in b.items():
-            if p == self.sign_prime:
+        # Single pass over both sorted encodings: each factor of a is
+        # unpacked once and either copied or reduced by b's exponent
+        result: List[Tuple[int, int]] = []
+        append = result.append
+        i = 0
+        len_a = len(a)
+        for p, e in b:
+            have = 0
+            while i < len_a:
+                q, exp = a[i]
+                if q < p:
+                    append(a[i])
+                    i += 1
+                    continue
+                if q == p:
+                    have = exp
+                    i += 1
+                break
+            if have != e:
                 # dividing by negative flips sign if odd exponent
-                result[self.sign_prime] = result.get(self.sign_prime, 0) - e
-                continue
-            have = result.get(p, 0)
-            if have < e:
-                raise ValueError("Division results in non-integer.")
-            result[p] = have - e
-            if result[p] == 0:
-                del result[p]
-        return result
+                if have < e and p != self.sign_prime:
+                    raise ValueError("Division results in non-integer.")
+                append((p, have - e))
+        if i < len_a:
+            result.extend(a[i:])
+        return tuple(result)
 
-    def add(self, a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    def add(self, a: Encoding, b: Encoding) -> Encoding:
         """E(a) ⊕ E(b) = E(a + b)【248†L66-L73】. Decode, add and reencode."""
         ia = self.decode_integer(a)
         ib = self.decode_integer(b)
         return self.encode_integer(ia + ib)
 
-    def subtract(self, a: Dict[int, int], b: Dict[int, int]) -> Dict[int, int]:
+    def subtract(self, a: Encoding, b: Encoding) -> Encoding:
         """E(a) ⊖ E(b) = E(a - b)【248†L73-L76】. Decode, subtract and reencode."""
         ia = self.decode_integer(a)
         ib = self.decode_integer(b)
@@ -219,24 +379,29 @@ class PrimeEncoder:
 
     # Concept encoding/decoding -----------------------------------------------
 
-    def encode_symbol(self, symbol: str) -> Dict[int, int]:
+    def encode_symbol(self, symbol: str) -> Encoding:
         """Encode a concept/word as a single prime factor with exponent 1."""
         p = self.get_prime(symbol)
-        return {p: 1}
+        return ((p, 1),)
 
-    def decode_symbol(self, encoding: Dict[int, int]) -> Optional[str]:
+    def decode_symbol(self, encoding: Encoding) -> Optional[str]:
         """Decode a one-factor encoding back to its concept name (if known)."""
         # Only valid for single-prime encodings (excluding sign prime)
-        primes = [p for p in encoding if p != self.sign_prime]
-        if len(primes) == 1 and encoding[primes[0]] == 1:
-            return self._prime_to_concept.get(primes[0])
+        factors = [(p, e) for p, e in encoding if p != self.sign_prime]
+        if len(factors) == 1 and factors[0][1] == 1:
+            return self._prime_to_concept.get(factors[0][0])
         return None
 
 ###############################################################################
 # Facts and rules
 ###############################################################################
 
-@dataclass
+# Facts and rules are created in bulk, so they use __slots__ (a smaller
+# instance without a __dict__, and faster attribute access) where the
+# interpreter's dataclasses support it (Python 3.10+).
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class Fact:
     subject: str
     predicate: str
@@ -245,7 +410,25 @@ class Fact:
     def __str__(self) -> str:
         return f"{self.subject} {self.predicate} {self.object}"
 
-@dataclass
+    def to_primes(self, encoder: PrimeEncoder) -> Tuple[int, int, int]:
+        """Return the (subject, predicate, object) primes identifying this fact."""
+        return (encoder.get_prime(self.subject),
+                encoder.get_prime(self.predicate),
+                encoder.get_prime(self.object))
+
+    def lookup_primes(self, table: Union[PrimeEncoder, KnowledgeBase]) -> Optional[Tuple[int, int, int]]:
+        """Like `to_primes`, but return None if any concept has no prime yet.
+
+        `table` is an encoder or a knowledge base; either provides `lookup_prime`.
+        """
+        s = table.lookup_prime(self.subject)
+        p = table.lookup_prime(self.predicate)
+        o = table.lookup_prime(self.object)
+        if s is None or p is None or o is None:
+            return None
+        return (s, p, o)
+
+@dataclass(**_SLOTS)
 class Rule:
     conditions: List[Fact]
     conclusion: Fact
@@ -257,7 +440,7 @@ class Rule:
     @staticmethod
     def create_universal_rule(category: str, property: str) -> 'Rule':
         # All X are Y
-        var = "_x_"
+        var = VARIABLE
         return Rule(conditions=[Fact(var, "is", category)],
                     conclusion=Fact(var, "is", property),
                     type="universal",
@@ -267,7 +450,7 @@ class Rule:
     @staticmethod
     def create_capability_rule(category: str, capability: str) -> 'Rule':
         # All X can Y
-        var = "_x_"
+        var = VARIABLE
         return Rule(conditions=[Fact(var, "is", category)],
                     conclusion=Fact(var, "can", capability),
                     type="capability",
@@ -278,33 +461,163 @@ class Rule:
 # Knowledge base
 ###############################################################################
 
+class _UniversalGraph:
+    """Frozen snapshot of a knowledge base's universal-rule graph.
+
+    `chains` caches `_universal_chain_search` results for this snapshot.
+    Adding a rule makes the knowledge base build a new snapshot rather than
+    mutate this one, so the old results are dropped along with it.
+    """
+    __slots__ = ('rev', 'adj', 'chains')
+
+    def __init__(self, rev: int, adj: Dict[str, List[str]]) -> None:
+        self.rev = rev
+        self.adj: Dict[str, Tuple[str, ...]] = {k: tuple(v) for k, v in adj.items()}
+        self.chains: Dict[Tuple[str, str], Optional[Tuple[str, ...]]] = {}
+
 class KnowledgeBase:
     """
     Store encoded facts and rules.  Facts are encoded as the product of primes
     representing subject, predicate and object.  Rules store encoded
     conditions and conclusions along with metadata for universals and capabilities.
+
+    Hash indices are maintained on insertion so the reasoner can look up
+    matching facts and rules directly instead of scanning the whole KB.
     """
     def __init__(self, encoder: PrimeEncoder) -> None:
         self.encoder = encoder
-        self.fact_encodings: List[Dict[int, int]] = []
+        self.fact_encodings: List[Encoding] = []
         self.rules: List[Dict[str, any]] = []
         self.facts: List[Fact] = []  # Keep original facts for reference
+        # Indices: facts by their (subject, predicate, object) prime triples
+        # for containment tests, facts by (subject, predicate) for transitive steps,
+        # universal/capability rules by (predicate, property_prime) for rule
+        # dispatch, and the universal-rule graph as category -> super categories.
+        # Standard rules are indexed by their conclusion encoding, or by the
+        # conclusion's (predicate, object) primes when its subject is the
+        # rule variable.
+        self._fact_lookup: Dict[Tuple[int, int, int], Fact] = {}
+        self._by_subject_pred: Dict[Tuple[str, str], List[Fact]] = {}
+        self._rules_by_property_prime: Dict[Tuple[str, int], List[Dict[str, any]]] = {}
+        self._std_by_concl: Dict[Encoding, List[Dict[str, any]]] = {}
+        self._std_by_var_concl: Dict[Tuple[int, int], List[Dict[str, any]]] = {}
+        self._universal_adj: Dict[str, List[str]] = {}
+        # Rule-set revision, bumped by add_rule, and the graph snapshot taken
+        # at a given revision
+        self._rev: int = 0
+        self._graph: Optional[_UniversalGraph] = None
+        # Number of 'X is category' facts per category, and whether the
+        # universal/capability buckets are ordered by it (see order_rules)
+        self._members: Counter = Counter()
+        self._rules_ordered = True
+        # ids of the universal/capability rules promote_rule has moved to
+        # the front of their buckets (see order_rules)
+        self._promoted: Set[int] = set()
+        # Concept table snapshot taken by freeze(); None while facts and
+        # rules may still be added
+        self.concepts: Optional[MappingProxyType] = None
+
+    def freeze(self) -> MappingProxyType:
+        """Finish construction: snapshot the concept table and reject further facts and rules.
+
+        Every concept in the knowledge base has its prime assigned by now, so
+        from here on `lookup_prime` reads the snapshot rather than the
+        encoder, whose table other knowledge bases may still extend.
+        Returns the read-only concept -> prime snapshot.
+        """
+        if self.concepts is None:
+            self.concepts = MappingProxyType(dict(self.encoder._concept_to_prime))
+        return self.concepts
+
+    def order_rules(self) -> None:
+        """Order the universal/capability rule buckets.
+
+        This is the one place the rule order is decided:
 
-    def add_fact(self, fact: Fact) -> Dict[int, int]:
-        enc = self.encode_fact(fact)
+        - Standard rule buckets are ordered by condition count when a rule is
+          added (`_insert_standard`) and are never reordered after that.
+        - In universal/capability buckets, rules that have proved a goal come
+          first, most recent first (`promote_rule`); the others follow, those
+          whose category has the most members first.
+
+        The reasoner calls this before a query whenever facts or rules were
+        added since the last ordering.  The sort is stable, so promoted rules
+        and rules with equally many members keep their current order.
+        """
+        members = self._members
+        promoted = self._promoted
+        for bucket in self._rules_by_property_prime.values():
+            bucket.sort(key=lambda rule: (id(rule) not in promoted,
+                                          -members[rule['category_name'].lower()]))
+        self._rules_ordered = True
+
+    def promote_rule(self, bucket: List[Dict[str, any]], rule: Dict[str, any]) -> None:
+        """Move a universal/capability rule that proved a goal to the front of `bucket`."""
+        self._promoted.add(id(rule))
+        for i, other in enumerate(bucket):
+            if other is rule:
+                if i:
+                    del bucket[i]
+                    bucket.insert(0, rule)
+                break
+
+    def lookup_prime(self, concept: str) -> Optional[int]:
+        """Return the prime of `concept`, or None if it has none.
+
+        Reads the frozen concept table once `freeze` has been called, and the
+        encoder's live table before that.
+        """
+        if self.concepts is not None:
+            return self.concepts.get(concept.lower())
+        return self.encoder.lookup_prime(concept)
+
+    @staticmethod
+    def _insert_standard(bucket: List[Dict[str, any]], encoded_rule: Dict[str, any]) -> None:
+        """Insert a standard rule, keeping the bucket ordered by condition count.
+
+        Rules with fewer conditions are cheaper to try, so they come first;
+        rules with equal counts keep their insertion order (see order_rules).
+        """
+        n = len(encoded_rule['conditions'])
+        i = len(bucket)
+        while i and len(bucket[i - 1]['conditions']) > n:
+            i -= 1
+        bucket.insert(i, encoded_rule)
+
+    def _check_not_frozen(self) -> None:
+        if self.concepts is not None:
+            raise ValueError("Knowledge base is frozen; no facts or rules can be added.")
+
+    def add_fact(self, fact: Fact) -> Encoding:
+        self._check_not_frozen()
+        triple = fact.to_primes(self.encoder)
+        enc = self.encode_triple(triple)
         self.fact_encodings.append(enc)
         self.facts.append(fact)
+        # The first of any duplicate facts is the one reported
+        self._fact_lookup.setdefault(triple, fact)
+        self._by_subject_pred.setdefault((fact.subject, fact.predicate), []).append(fact)
+        if fact.predicate == 'is':
+            self._members[fact.object.lower()] += 1
+            self._rules_ordered = False
         return enc
 
-    def encode_fact(self, fact: Fact) -> Dict[int, int]:
-        s_enc = self.encoder.encode_symbol(fact.subject)
-        p_enc = self.encoder.encode_symbol(fact.predicate)
-        o_enc = self.encoder.encode_symbol(fact.object)
+    def encode_fact(self, fact: Fact) -> Encoding:
+        return self.encode_triple(fact.to_primes(self.encoder))
+
+    def encode_triple(self, triple: Tuple[int, int, int]) -> Encoding:
+        """Encode a fact given as its (subject, predicate, object) primes."""
+        s, p, o = triple
+        # Three distinct primes each with exponent 1: the product is just the
+        # sorted triple, no merge required
+        if s != p and p != o and s != o:
+            return tuple(sorted(((s, 1), (p, 1), (o, 1))))
         # Multiply the three to get a single encoding
-        return self.encoder.multiply(self.encoder.multiply(s_enc, p_enc), o_enc)
+        return self.encoder.multiply(self.encoder.multiply(((s, 1),), ((p, 1),)), ((o, 1),))
 
     def add_rule(self, rule: Rule) -> Dict[str, any]:
         """Encode and store a rule."""
+        self._check_not_frozen()
         if rule.type == "universal" or rule.type == "capability":
             cond_enc = self.encode_fact(rule.conditions[0])
             concl_enc = self.encode_fact(rule.conclusion)
@@ -313,41 +626,248 @@ class KnowledgeBase:
                 'category_prime': self.encoder.get_prime(rule.category),
                 'property_prime': self.encoder.get_prime(rule.property) if rule.type == 'universal' else self.encoder.get_prime(rule.capability),
                 'predicate_prime': self.encoder.get_prime('is') if rule.type == 'universal' else self.encoder.get_prime('can'),
+                'category_name': rule.category,
                 'condition_encoding': cond_enc,
                 'conclusion_encoding': concl_enc
             }
+            key = ('is' if rule.type == 'universal' else 'can', encoded_rule['property_prime'])
+            self._rules_by_property_prime.setdefault(key, []).append(encoded_rule)
+            self._rules_ordered = False
+            if rule.type == 'universal':
+                self._universal_adj.setdefault(rule.category.lower(), []).append(rule.property.lower())
         else:
             cond_encs = [self.encode_fact(cond) for cond in rule.conditions]
-            concl_enc = self.encode_fact(rule.conclusion)
+            concl_triple = rule.conclusion.to_primes(self.encoder)
+            concl_enc = self.encode_triple(concl_triple)
+            # The encodings are commutative products, so keep the condition
+            # facts too: they record which concept is the subject/object.
             encoded_rule = {
                 'type': 'standard',
+                'conditions': list(rule.conditions),
                 'condition_encodings': cond_encs,
                 'conclusion_encoding': concl_enc
             }
+            if concl_triple[0] == self.encoder.var_prime:
+                self._insert_standard(self._std_by_var_concl.setdefault(concl_triple[1:], []), encoded_rule)
+            else:
+                self._insert_standard(self._std_by_concl.setdefault(concl_enc, []), encoded_rule)
         self.rules.append(encoded_rule)
+        self._rev += 1
         return encoded_rule
 
+    def universal_graph(self) -> _UniversalGraph:
+        """Return a snapshot of the universal-rule graph for the current rule set."""
+        if self._graph is None or self._graph.rev != self._rev:
+            self._graph = _UniversalGraph(self._rev, self._universal_adj)
+        return self._graph
+
 ###############################################################################
 # Reasoning engine
 ###############################################################################
 
+def _universal_chain_search(graph: _UniversalGraph, subj: str, target: str) -> Optional[Tuple[str, ...]]:
+    """Return the shortest chain of universal rules from `subj` to `target`.
+
+    The result depends only on the graph snapshot and the two names, so it is
+    cached in the snapshot's `chains` across queries.
+    """
+    key = (subj, target)
+    if key in graph.chains:
+        return graph.chains[key]
+    chain = _universal_chain_bfs(graph.adj, subj, target)
+    graph.chains[key] = chain
+    return chain
+
+
+def _universal_chain_bfs(adj: Dict[str, Tuple[str, ...]], subj: str, target: str) -> Optional[Tuple[str, ...]]:
+    """Breadth-first search of `adj` for the shortest chain from `subj` to `target`."""
+    # Concept names are stored lower-cased, like the primes they map to
+    start = subj.lower()
+    parent: Dict[str, Optional[str]] = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for prop_name in adj.get(node, ()):
+            if prop_name in parent:
+                continue
+            parent[prop_name] = node
+            if prop_name == target:
+                # Walk the parent links back to the start
+                chain = [prop_name]
+                while node is not None:
+                    chain.append(node)
+                    node = parent[node]
+                chain.reverse()
+                chain[0] = subj
+                return tuple(chain)
+            queue.append(prop_name)
+    return None
+
+# Proofs are passed between sub-goals as nested tuples tagged by their kind,
+# e.g. ('fact', fact) or ('rule', sub_proof, rule_type, subject, category,
+# property), and rendered as text only for the top-level answer.
+Proof = Tuple[any, ...]
+
+# Returned by ReasoningEngine._open when it has pushed a search for a sub-goal
+_PENDING = object()
+
+# Provisional failures of a sub-goal: _CUTOFF when the depth limit cut its
+# search short, _CYCLE when it relied on a sub-goal that was already being
+# searched.  A _CUTOFF failure holds for any later search from the same
+# depth or deeper; a _CYCLE failure only until some sub-goal is proven,
+# since the goal it was waiting on may be among them.
+_CUTOFF = object()
+_CYCLE = object()
+
 class ReasoningEngine:
     """Deduce whether a query fact is entailed by a knowledge base."""
     def __init__(self, encoder: PrimeEncoder) -> None:
         self.encoder = encoder
+        # Sub-goals are identified by their (subject, predicate, object)
+        # primes.  _visited holds those currently being searched (on the
+        # stack); _cut_depth maps each sub-goal that failed provisionally in
+        # this pass to (depth searched at, _CUTOFF or _CYCLE, number of
+        # proofs memoised when it failed)
+        self._visited: Set[Tuple[int, int, int]] = set()
+        self._cut_depth: Dict[Tuple[int, int, int], Tuple[int, object, int]] = {}
+        self._memo: Dict[Tuple[int, int, int], Proof] = {}
+        # Sub-goals whose search was exhausted without any cutoff, so are
+        # unprovable at any depth
+        self._fail_memo: Set[Tuple[int, int, int]] = set()
+        self._max_depth: int = MAX_DEPTH
+        # Whether the depth limit cut off any sub-goal in the current pass
+        self._depth_cut: bool = False
+        # (bucket, rule) for each universal/capability rule that proved a
+        # goal during the current query; deduce promotes them afterwards
+        self._wins: List[Tuple[List[Dict[str, any]], Dict[str, any]]] = []
 
-    def deduce(self, kb: KnowledgeBase, query: Fact) -> Dict[str, any]:
-        """Public API for deducing a fact.  Resets the visited set each time."""
-        self._visited: Set[str] = set()
-        result = self._deduce(kb, query, depth=0)
+    def deduce(self, kb: KnowledgeBase, query: Fact, max_depth: int = MAX_DEPTH, explain: bool = True) -> Dict[str, any]:
+        """Public API for deducing a fact.  Resets the visited set and memo tables each time.
+
+        Sub-goals more than `max_depth` steps below the query are not explored.
+        The search is iteratively deepened (depth limits 4, 8, 16, ... up to
+        `max_depth`), so proofs found are short and failures that hit no
+        limit end the search early.  With `explain` false only the 'result'
+        entry is meaningful and no explanation text is built.
+        """
+        if not kb._rules_ordered:
+            kb.order_rules()
+        self._memo = {}
+        self._fail_memo = set()
+        self._wins = []
+        # Proofs and final failures stay valid as the limit grows, so the
+        # memo tables are kept across passes
+        limit = min(4, max_depth)
+        while True:
+            self._visited = set()
+            self._cut_depth = {}
+            self._max_depth = limit
+            self._depth_cut = False
+            result = self._deduce(kb, query, depth=0, want_explain=explain)
+            if result['result'] or not self._depth_cut or limit >= max_depth:
+                break
+            limit = min(2 * limit, max_depth)
+        # Done only now, as paused searches may still be iterating a bucket
+        for bucket, rule in self._wins:
+            kb.promote_rule(bucket, rule)
         return result
 
-    def _deduce(self, kb: KnowledgeBase, query: Fact, depth: int) -> Dict[str, any]:
-        key = str(query)
-        if key in self._visited:
-            return { 'result': False, 'explanation': f"Circular reasoning detected: {query}" }
-        self._visited.add(key)
+    def _deduce(self, kb: KnowledgeBase, query: Fact, depth: int, want_explain: bool = False) -> Dict[str, any]:
+        """Evaluate `query` using an explicit stack of sub-goal searches.
 
+        Each open sub-goal is a `_search` generator paused at the sub-goal it
+        is waiting on, so deep proofs do not consume Python stack frames.
+        Sub-goals pass raw proof tuples (or None) up; the answer is formatted
+        only here, and only when `want_explain` is set.
+        """
+        # Frames are [search, triple, taint, depth].  A frame's taint is the
+        # provisional failure (_CUTOFF, or _CYCLE, which takes precedence) of
+        # any sub-goal it relied on, and makes its own failure provisional
+        # in the same way
+        stack: List[list] = []
+        # `proof` is the answer for the sub-goal most recently opened or
+        # finished, to be sent to the search waiting on it
+        proof = self._open(kb, query, depth, stack)
+        while stack:
+            frame = stack[-1]
+            if proof is _CUTOFF or proof is _CYCLE:
+                if frame[2] is not _CYCLE:
+                    frame[2] = proof
+                proof = None
+            try:
+                if proof is _PENDING:
+                    sub_query, sub_depth = next(frame[0])
+                else:
+                    sub_query, sub_depth = frame[0].send(proof)
+            except StopIteration as stop:
+                stack.pop()
+                self._visited.discard(frame[1])
+                proof = stop.value
+                if proof is not None:
+                    self._memo[frame[1]] = proof
+                elif frame[2] is not None:
+                    proof = frame[2]
+                    self._cut_depth[frame[1]] = (frame[3], proof, len(self._memo))
+                else:
+                    self._fail_memo.add(frame[1])
+                continue
+            proof = self._open(kb, sub_query, sub_depth, stack)
+        if proof is None or proof is _CUTOFF or proof is _CYCLE:
+            if not want_explain:
+                return { 'result': False, 'explanation': '' }
+            if self._depth_cut:
+                return { 'result': False, 'explanation': f"Depth limit reached: {query}" }
+            return { 'result': False, 'explanation': f"Could not deduce: {query}" }
+        if not want_explain:
+            return { 'result': True, 'explanation': '' }
+        return { 'result': True, 'explanation': self._explain(proof) }
+
+    def _open(self, kb: KnowledgeBase, query: Fact, depth: int, stack: List[list]) -> any:
+        """Answer `query` immediately if possible, else push a search for it and return `_PENDING`.
+
+        An immediate answer is a proof, None for a final failure, or
+        `_CUTOFF` / `_CYCLE` for a failure that a deeper or later search
+        might overturn.
+        """
+        # Concepts are only looked up, never assigned, while reasoning.  One
+        # the knowledge base has never seen cannot match any fact or rule, so
+        # only the identity 'X is X' can still hold.
+        triple = query.lookup_primes(kb)
+        if triple is None:
+            if query.predicate == 'is' and query.subject == query.object:
+                return ('identity', query.subject)
+            return None
+        # Sub-goals proven earlier in this query are reused rather than
+        # searched again (e.g. 'human is mortal' reached via several subjects).
+        cached = self._memo.get(triple)
+        if cached is not None:
+            return cached
+        if triple in self._fail_memo:
+            return None
+        # Sub-goals still being searched, those that failed provisionally at
+        # this depth or shallower, and those past the depth limit fail
+        # provisionally.  A failed sub-goal is searched again when reached
+        # with more depth to spare, or after a cycle failure once any new
+        # sub-goal has been proven.
+        if triple in self._visited:
+            return _CYCLE
+        if depth > self._max_depth:
+            self._depth_cut = True
+            return _CUTOFF
+        cut = self._cut_depth.get(triple)
+        if cut is not None and depth >= cut[0]:
+            if cut[1] is _CUTOFF or cut[2] == len(self._memo):
+                return cut[1]
+        self._visited.add(triple)
+        stack.append([self._search(kb, query, triple, depth), triple, None, depth])
+        return _PENDING
+
+    def _search(self, kb: KnowledgeBase, query: Fact, triple: Tuple[int, int, int], depth: int) -> Generator[Tuple[Fact, int], Optional[Proof], Optional[Proof]]:
+        """Search for a proof of `query`.
+
+        Yields each sub-goal as ``(fact, depth)`` and receives its proof (or
+        None) from `_deduce`; returns the proof for `query` itself, or None.
+        """
         # Identity membership: any concept is considered to belong to itself.  This
         # allows universal and capability rules to apply to category names (e.g.,
         # 'rings is abelian_groups' can be deduced via the rule 'all rings are
@@ -356,7 +876,11 @@ class ReasoningEngine:
         # belongs to its own superset because the requisite membership fact is
         # missing.  Treating X is X as always true resolves that issue.
         if query.predicate == 'is' and query.subject == query.object:
-            return { 'result': True, 'explanation': f"{query.subject} is itself by definition" }
+            return ('identity', query.subject)
+
+        # Per-query values shared by the checks below
+        q_pred_is_is = query.predicate == 'is'
+        q_object_prime = triple[2]
 
         # Transitive closure for universal rules on category hierarchies.  If there
         # is a chain of universal rules A→B→...→Z linking the subject category
@@ -364,66 +888,117 @@ class ReasoningEngine:
         # requiring explicit membership facts.  This handles cases like
         # 'Hilbert_spaces is normed_spaces', where universal rules are
         # Hilbert_spaces→inner_product_spaces and inner_product_spaces→normed_spaces.
-        if query.predicate == 'is':
+        if q_pred_is_is:
             try:
                 if self._is_universal_subset(kb, query.subject, query.object):
-                    return { 'result': True, 'explanation': f"All {query.subject} are {query.object} by transitive closure of universal rules" }
+                    return ('subset', query.subject, query.object)
             except Exception:
                 # If an error occurs (e.g., missing encoder), ignore and proceed
                 pass
 
         # Encode the query fact
-        q_enc = kb.encode_fact(query)
-        # Direct fact present?
-        for fact_enc, fact in zip(kb.fact_encodings, kb.facts):
-            if fact_enc == q_enc:
-                return { 'result': True, 'explanation': f"Direct fact in knowledge base: {fact}" }
-
-        # Check universal/capability rules
-        for rule in kb.rules:
-            if rule['type'] in ('universal', 'capability'):
-                # If predicate matches rule's predicate and object matches property/capability
-                if query.predicate == ('is' if rule['type'] == 'universal' else 'can'):
-                    # If query.object matches the property's concept name
-                    if self.encoder.get_prime(query.object) == rule['property_prime']:
-                        # Create membership fact: subject is category
-                        membership = Fact(query.subject, 'is', kb.encoder._prime_to_concept[rule['category_prime']])
-                        sub_res = self._deduce(kb, membership, depth+1)
-                        if sub_res['result']:
-                            clause = 'are' if rule['type'] == 'universal' else 'can'
-                            return { 'result': True, 'explanation': f"{sub_res['explanation']}, and all {kb.encoder._prime_to_concept[rule['category_prime']]} {clause} {query.object}" }
-
-        # Check standard rules
-        for rule in kb.rules:
-            if rule['type'] == 'standard' and rule['conclusion_encoding'] == q_enc:
-                # All conditions must be true
-                explanations = []
-                all_ok = True
-                for cond_enc in rule['condition_encodings']:
-                    cond_fact = self._decode_fact(cond_enc, kb)
-                    if cond_fact is None:
-                        all_ok = False
-                        break
-                    sub_res = self._deduce(kb, cond_fact, depth+1)
-                    if not sub_res['result']:
-                        all_ok = False
-                        break
-                    explanations.append(sub_res['explanation'])
-                if all_ok:
-                    return { 'result': True, 'explanation': f"{', '.join(explanations)}, which implies {query}" }
+        q_enc = kb.encode_triple(triple)
+        # Direct fact present?  Facts are looked up by prime triple, which
+        # keeps the subject/object roles the commutative encoding loses.
+        fact = kb._fact_lookup.get(triple)
+        if fact is not None:
+            return ('fact', fact)
+
+        # Check universal/capability rules whose predicate and property match the query
+        bucket = kb._rules_by_property_prime.get((query.predicate, q_object_prime), ())
+        for rule in bucket:
+            # Create membership fact: subject is category
+            category = rule['category_name']
+            membership = Fact(query.subject, 'is', category)
+            sub_proof = yield membership, depth + 1
+            if sub_proof is not None:
+                self._wins.append((bucket, rule))
+                return ('rule', sub_proof, rule['type'], query.subject, category, query.object)
+
+        # Check standard rules whose conclusion is the query
+        bucket = kb._std_by_concl.get(q_enc, ())
+        for rule in bucket:
+            # All conditions must be true
+            sub_proofs = []
+            all_ok = True
+            for cond_fact in rule['conditions']:
+                sub_proof = yield cond_fact, depth + 1
+                if sub_proof is None:
+                    all_ok = False
+                    break
+                sub_proofs.append(sub_proof)
+            if all_ok:
+                return ('standard', tuple(sub_proofs), query)
+
+        # Check standard rules whose conclusion is "X <predicate> <object>",
+        # binding X to the query subject in their conditions
+        bucket = kb._std_by_var_concl.get(triple[1:], ())
+        for rule in bucket:
+            sub_proofs = []
+            all_ok = True
+            for cond_fact in rule['conditions']:
+                sub_proof = yield self._bind(cond_fact, query.subject), depth + 1
+                if sub_proof is None:
+                    all_ok = False
+                    break
+                sub_proofs.append(sub_proof)
+            if all_ok:
+                return ('standard', tuple(sub_proofs), query)
 
         # Try transitive reasoning for 'is' and 'part of'
         if query.predicate in ('is', 'part of'):
-            for fact_enc, fact in zip(kb.fact_encodings, kb.facts):
-                if fact.subject == query.subject and fact.predicate == query.predicate:
-                    intermediate = Fact(fact.object, query.predicate, query.object)
-                    sub_res = self._deduce(kb, intermediate, depth+1)
-                    if sub_res['result']:
-                        return { 'result': True, 'explanation': f"{query.subject} {query.predicate} {fact.object}, and {sub_res['explanation']}" }
+            for fact in kb._by_subject_pred.get((query.subject, query.predicate), ()):
+                intermediate = Fact(fact.object, query.predicate, query.object)
+                sub_proof = yield intermediate, depth + 1
+                if sub_proof is not None:
+                    return ('transitive', query.subject, query.predicate, fact.object, sub_proof)
 
-        return { 'result': False, 'explanation': f"Could not deduce: {query}" }
+        return None
+
+    def _bind(self, fact: Fact, value: str) -> Fact:
+        """Return `fact` with `value` substituted for the rule variable."""
+        var_prime = self.encoder.var_prime
+        subject = value if self.encoder.lookup_prime(fact.subject) == var_prime else fact.subject
+        obj = value if self.encoder.lookup_prime(fact.object) == var_prime else fact.object
+        return Fact(subject, fact.predicate, obj)
+
+    def _explain(self, proof: Proof) -> str:
+        """Render a proof tree as its plain-English explanation."""
+        parts: List[str] = []
+        # Pending pieces, each a literal string or a proof still to expand;
+        # expanding on an explicit stack copes with proofs of any depth
+        stack: List[any] = [proof]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+                continue
+            kind = node[0]
+            if kind == 'identity':
+                parts.append(f"{node[1]} is itself by definition")
+            elif kind == 'subset':
+                parts.append(f"All {node[1]} are {node[2]} by transitive closure of universal rules")
+            elif kind == 'fact':
+                parts.append(f"Direct fact in knowledge base: {node[1]}")
+            elif kind == 'rule':
+                _, sub, rule_type, _, category, prop = node
+                clause = 'are' if rule_type == 'universal' else 'can'
+                stack.append(f", and all {category} {clause} {prop}")
+                stack.append(sub)
+            elif kind == 'standard':
+                _, subs, conclusion = node
+                stack.append(f", which implies {conclusion}")
+                for i in range(len(subs) - 1, -1, -1):
+                    stack.append(subs[i])
+                    if i:
+                        stack.append(", ")
+            else:  # 'transitive'
+                _, subject, predicate, mid, sub = node
+                stack.append(sub)
+                stack.append(f"{subject} {predicate} {mid}, and ")
+        return ''.join(parts)
 
-    def _is_universal_subset(self, kb: KnowledgeBase, subj: str, target: str, visited: Optional[Set[str]] = None) -> bool:
+    def _is_universal_subset(self, kb: KnowledgeBase, subj: str, target: str) -> bool:
         """Return True if `subj` is contained in `target` via a chain of universal rules.
 
         This helper searches the directed graph defined by universal rules
@@ -438,65 +1013,45 @@ class ReasoningEngine:
             Name of the starting category (subject).
         target : str
             Name of the desired super category (object).
-        visited : Optional[Set[str]]
-            A set of categories visited in the current DFS to avoid cycles.
 
         Returns
         -------
         bool
             True if a transitive chain of universal rules connects `subj` to `target`.
         """
-        # Direct equality
-        if subj == target:
-            return True
-        # Initialise visited set
-        if visited is None:
-            visited = set()
-        # Avoid cycles
-        if subj in visited:
-            return False
-        visited.add(subj)
-        subj_prime = self.encoder.get_prime(subj)
-        # Explore universal rules where the category matches subj
-        for rule in kb.rules:
-            if rule.get('type') != 'universal':
-                continue
-            # Only consider rules whose category_prime equals subj's prime
-            if rule.get('category_prime') != subj_prime:
-                continue
-            # Determine the property name (super category)
-            prop_prime = rule.get('property_prime')
-            # Map property prime back to concept name; if not found, skip
-            prop_name = self.encoder._prime_to_concept.get(prop_prime)
-            if prop_name is None:
-                continue
-            # If property matches target, success
-            if prop_name == target:
-                return True
-            # Otherwise recurse
-            if self._is_universal_subset(kb, prop_name, target, visited):
-                return True
-        return False
+        return self._universal_chain(kb, subj, target) is not None
 
-    def _decode_fact(self, enc: Dict[int, int], kb: KnowledgeBase) -> Optional[Fact]:
-        # Factorise the encoding into exactly three concept primes (subject, predicate, object)
-        # This naive decoder works because each fact encoding is the product of three
-        # distinct primes with exponent 1.
-        primes: List[int] = []
-        for p, e in enc.items():
-            if p == self.encoder.sign_prime:
-                continue
-            for _ in range(e):
-                primes.append(p)
-        if len(primes) != 3:
+    def _universal_chain(self, kb: KnowledgeBase, subj: str, target: str) -> Optional[List[str]]:
+        """Return a list representing the chain of categories from `subj` to `target` via universal rules.
+
+        If there is a sequence subj → ... → target using universal rules, this returns a list
+        [subj, mid1, mid2, ..., target].  If no chain exists, return None.  The search is a
+        breadth-first walk over the knowledge base's universal-rule adjacency list, so the
+        shortest chain is returned.  Searches are cached across queries until the
+        knowledge base's rules change.
+
+        Parameters
+        ----------
+        kb : KnowledgeBase
+            The knowledge base with universal rules.
+        subj : str
+            The starting category.
+        target : str
+            The target category.
+
+        Returns
+        -------
+        Optional[List[str]]
+            The list of categories in the chain, or None if no chain exists.
+        """
+        # Direct equality yields a trivial chain
+        if subj == target:
+            return [subj]
+        # A target without a prime appears in no rule
+        if kb.lookup_prime(target) is None:
             return None
-        s, pred, o = primes
-        sub = self.encoder._prime_to_concept.get(s)
-        prd = self.encoder._prime_to_concept.get(pred)
-        obj = self.encoder._prime_to_concept.get(o)
-        if sub and prd and obj:
-            return Fact(sub, prd, obj)
-        return None
+        chain = _universal_chain_search(kb.universal_graph(), subj, target)
+        return list(chain) if chain is not None else None
 
 ###############################################################################
 # Demonstration
@@ -517,10 +1072,11 @@ def demo() -> None:
     # Standard rule: if X is human and X is philosopher then X is wise
     kb.add_fact(Fact('socrates', 'is', 'philosopher'))
     kb.add_rule(Rule(
-        conditions=[Fact('_x_', 'is', 'human'), Fact('_x_', 'is', 'philosopher')],
-        conclusion=Fact('_x_', 'is', 'wise'),
+        conditions=[Fact(VARIABLE, 'is', 'human'), Fact(VARIABLE, 'is', 'philosopher')],
+        conclusion=Fact(VARIABLE, 'is', 'wise'),
         type='standard'
     ))
+    kb.freeze()
     reasoner = ReasoningEngine(enc)
     # Queries
     queries = [
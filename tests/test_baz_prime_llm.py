@@ -0,0 +1,149 @@
+"""Regression checks for the prime-encoded reasoner.
+
+Both copies of the reasoner (``LLM/baz_prime_llm.py`` and
+``LLM/Notations/baz_prime_llm2_show_steps.py``) are exercised.  Run with
+``python -m unittest discover tests`` from the repository root.
+"""
+
+import importlib.util
+import pathlib
+import random
+import sys
+import unittest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+MODULE_PATHS = {
+    'baz_prime_llm': ROOT / 'LLM' / 'baz_prime_llm.py',
+    'baz_prime_llm2_show_steps': ROOT / 'LLM' / 'Notations' / 'baz_prime_llm2_show_steps.py',
+}
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses resolve annotations through sys.modules
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+MODULES = {name: _load(name, path) for name, path in MODULE_PATHS.items()}
+
+
+class EncodingTest(unittest.TestCase):
+
+    def assertRoundTrips(self, m, n):
+        encoder = m.PrimeEncoder()
+        encoding = encoder.encode_integer(n)
+        self.assertEqual(encoder.decode_integer(encoding), n)
+        primes = [p for p, _ in encoding if p != encoder.sign_prime]
+        self.assertEqual(primes, sorted(primes))
+        self.assertTrue(all(m._is_prime(p) for p in primes))
+
+    def test_is_prime_matches_trial_division(self):
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                for n in range(-5, 5000):
+                    expected = n > 1 and all(n % d for d in range(2, int(n ** 0.5) + 1))
+                    self.assertEqual(m._is_prime(n), expected, n)
+
+    def test_round_trip(self):
+        rng = random.Random(0)
+        values = [1, -1, 2, -2, 97, 2 ** 20, 3 ** 13 * 7]
+        values += [rng.randrange(-10 ** 6, 10 ** 6) or 1 for _ in range(500)]
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                for n in values:
+                    self.assertRoundTrips(m, n)
+
+    def test_round_trip_large_primes(self):
+        # Primes and cofactors beyond the sieve, the trial-division range
+        # and MR_EXACT_BOUND
+        values = [2 ** 61 - 1, 2 ** 89 - 1, -(2 ** 89 - 1) * 3,
+                  1_000_003 * (10 ** 15 + 37), (2 ** 127 - 1) * 2 ** 5]
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                for n in values:
+                    self.assertRoundTrips(m, n)
+                self.assertEqual(m.PrimeEncoder().encode_integer(2 ** 89 - 1), ((2 ** 89 - 1, 1),))
+
+    def test_hard_semiprime_is_rejected(self):
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                with self.assertRaises(ValueError):
+                    m.PrimeEncoder().encode_integer((10 ** 9 + 7) * (10 ** 9 + 9))
+
+    def test_zero_is_rejected(self):
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                with self.assertRaises(ValueError):
+                    m.PrimeEncoder().encode_integer(0)
+
+
+class ReasoningTest(unittest.TestCase):
+
+    def test_cycle_does_not_block_later_proof(self):
+        # q <- y, z;  y <- x;  y <- f1;  x <- y;  z <- w;  w <- x;  fact f1.
+        # x first fails because y is still being searched; once y is proven
+        # via f1, x (and so w, z and q) must be provable.
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                kb = m.KnowledgeBase(m.PrimeEncoder())
+                goal = lambda s: m.Fact(s, 'is', 'true')
+                for concl, conds in [('q', ['y', 'z']), ('y', ['x']), ('y', ['f1']),
+                                     ('x', ['y']), ('z', ['w']), ('w', ['x'])]:
+                    kb.add_rule(m.Rule(conditions=[goal(c) for c in conds],
+                                       conclusion=goal(concl), type='standard'))
+                kb.add_fact(goal('f1'))
+                result = m.ReasoningEngine(kb.encoder).deduce(kb, goal('q'))
+                self.assertTrue(result['result'], result['explanation'])
+
+    def test_cut_off_goal_is_retried_at_shallower_depth(self):
+        # a part of z is provable well within MAX_DEPTH via the shortcut
+        # a part of g, but the long chain a, x1..x15, g first reaches g close
+        # to the depth limit, where the rest of the proof is cut off.
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                kb = m.KnowledgeBase(m.PrimeEncoder())
+                chain = ['a'] + [f'x{i}' for i in range(1, 16)] + ['g']
+                tail = ['g'] + [f'h{i}' for i in range(1, 20)] + ['z']
+                for u, v in zip(chain, chain[1:]):
+                    kb.add_fact(m.Fact(u, 'part of', v))
+                kb.add_fact(m.Fact('a', 'part of', 'g'))
+                for u, v in zip(tail, tail[1:]):
+                    kb.add_fact(m.Fact(u, 'part of', v))
+                result = m.ReasoningEngine(kb.encoder).deduce(kb, m.Fact('a', 'part of', 'z'))
+                self.assertTrue(result['result'], result['explanation'])
+
+    def test_promoted_rule_survives_reordering(self):
+        # Dogs outnumber cats, so order_rules puts the dog rule first until
+        # the cat rule proves a goal; a later reordering must not undo that.
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                kb = m.KnowledgeBase(m.PrimeEncoder())
+                kb.add_rule(m.Rule.create_universal_rule('cat', 'fluffy'))
+                kb.add_rule(m.Rule.create_universal_rule('dog', 'fluffy'))
+                for dog in ('rex', 'fido'):
+                    kb.add_fact(m.Fact(dog, 'is', 'dog'))
+                kb.add_fact(m.Fact('tom', 'is', 'cat'))
+                engine = m.ReasoningEngine(kb.encoder)
+                self.assertTrue(engine.deduce(kb, m.Fact('tom', 'is', 'fluffy'))['result'])
+                kb.add_fact(m.Fact('spot', 'is', 'dog'))
+                kb.order_rules()
+                (bucket,) = kb._rules_by_property_prime.values()
+                self.assertEqual([rule['category_name'] for rule in bucket], ['cat', 'dog'])
+    def test_universal_chain_follows_new_rules(self):
+        for name, m in MODULES.items():
+            with self.subTest(module=name):
+                kb = m.KnowledgeBase(m.PrimeEncoder())
+                kb.add_rule(m.Rule.create_universal_rule('cat', 'mammal'))
+                kb.add_fact(m.Fact('tom', 'is', 'animal'))
+                engine = m.ReasoningEngine(kb.encoder)
+                self.assertIsNone(engine._universal_chain(kb, 'cat', 'animal'))
+                kb.add_rule(m.Rule.create_universal_rule('mammal', 'animal'))
+                self.assertEqual(engine._universal_chain(kb, 'cat', 'animal'),
+                                 ['cat', 'mammal', 'animal'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+"""Accuracy checks for the fast integration paths of the fluid model.
+
+The ``"gauss"`` rules and the float32 batch scan are compared against the
+adaptive ``"quad"`` reference at the tolerances the module documents.  Run
+with ``python -m unittest discover tests`` from the repository root.
+"""
+
+import importlib.util
+import pathlib
+import sys
+import unittest
+
+import numpy as np
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+
+def _load(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+fluid = _load('baz_d2d_fluid_model', ROOT / 'baz_d2d_fluid_model.py')
+
+ALPHAS = np.linspace(0.0, 1.0, 11).tolist()
+CASES = [(eta, N_max) for eta in (2.5, 3.5, 4.5) for N_max in (1, 5)]
+# "gauss" agrees with quad to better than 1e-6; float32 scans to about 1e-6
+GAUSS_RTOL = 1e-6
+FLOAT32_RTOL = 1e-6
+
+
+class FluidModelAccuracyTest(unittest.TestCase):
+
+    def test_interference_gauss_matches_quad(self):
+        for eta, N_max in CASES:
+            with self.subTest(eta=eta, N_max=N_max):
+                for alpha in ALPHAS:
+                    reference = fluid.interference_integral(alpha, eta, N_max, method='quad')
+                    value = fluid.interference_integral(alpha, eta, N_max, method='gauss')
+                    self.assertLess(abs(value / reference - 1), GAUSS_RTOL, alpha)
+
+    def test_spectral_efficiency_gauss_matches_quad(self):
+        for eta, N_max in CASES:
+            with self.subTest(eta=eta, N_max=N_max):
+                for alpha in ALPHAS:
+                    reference = fluid.average_spectral_efficiency(alpha, eta, N_max, method='quad')
+                    value = fluid.average_spectral_efficiency(alpha, eta, N_max, method='gauss')
+                    self.assertLess(abs(value / reference - 1), GAUSS_RTOL, alpha)
+
+    def test_float32_scan_matches_quad(self):
+        for eta, N_max in CASES:
+            with self.subTest(eta=eta, N_max=N_max):
+                reference = fluid.scan_alpha_values(ALPHAS, eta, N_max, method='quad')
+                scan = fluid.scan_alpha_values(ALPHAS, eta, N_max, dtype=np.float32)
+                for (alpha, value), (_, expected) in zip(scan, reference):
+                    self.assertLess(abs(value / expected - 1), FLOAT32_RTOL, alpha)
+
+
+if __name__ == '__main__':
+    unittest.main()